@@ -1,5 +1,6 @@
 import streamlit as st
-from PIL import Image
+
+from dashboard.layout import load_image
 
 st.set_page_config(
     page_title="Home",
@@ -7,7 +8,7 @@ st.set_page_config(
 )
 
 image_path = 'img/curry.png'
-image = Image.open( image_path )
+image = load_image( image_path )
 st.sidebar.image( image, width=120 )
 
 st.sidebar.markdown( '# Cury Company' )
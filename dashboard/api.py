@@ -0,0 +1,302 @@
+"""
+    API HTTP somente leitura com as métricas do dashboard ( ASGI ).
+
+    Usa o mesmo carregamento ( dashboard.data ) e as mesmas funções de métricas
+    ( dashboard.metrics ) das páginas, com a mesma semântica de filtros da
+    barra lateral. As respostas ficam em cache por versão do dataset, levam um
+    ETag derivado dessa versão e as tabelas grandes são paginadas.
+
+    Uso:
+        python -m dashboard.api --port 8502
+        uvicorn dashboard.api:app
+
+    Filtros ( query string ):
+        date       Data limite exclusiva, YYYY-MM-DD ( padrão 2022-04-13 )
+        traffic    Densidades de trânsito, separadas por vírgula ( padrão: todas )
+        weather    Condições de clima, só nas rotas das visões Entregadores e
+                   Restaurantes ( padrão: todas )
+        page       Página das rotas paginadas ( começa em 1 )
+        page_size  Linhas por página ( padrão 100, máximo 1000 )
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import threading
+
+from collections import OrderedDict
+from datetime import datetime
+from urllib.parse import parse_qsl
+
+from dashboard import metrics
+from dashboard.data import (
+    DATASET_PATH, DATE_LIMIT, TRAFFIC_OPTIONS, data_version, filter_data, load_data
+)
+from dashboard.serialization import to_json_ready
+from dashboard.timeseries import OrderSeries
+
+CACHE_SIZE = 128
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+LIST_PARAMS = ( 'traffic', 'weather' )
+
+
+class BadRequest( ValueError ):
+    pass
+
+# ----------------------------------------
+#                FUNÇÕES
+# ----------------------------------------
+
+# rota: ( função da métrica, aceita filtro de clima, paginada, precisa da distância )
+ROUTES = {
+    '/empresa/orders-by-day': ( metrics.orders_by_day, False, False, False ),
+    '/empresa/order-share-by-traffic': ( metrics.order_share_by_traffic, False, False, False ),
+    '/empresa/orders-by-city-traffic': ( metrics.orders_by_city_traffic, False, False, False ),
+    '/empresa/orders-by-week': ( metrics.orders_by_week, False, False, False ),
+    '/empresa/orders-per-courier-by-week': ( metrics.orders_per_courier_by_week, False, False, False ),
+    '/empresa/city-traffic-location': ( metrics.city_traffic_location, False, False, False ),
+    '/empresa/rolling-7d': ( lambda df1: OrderSeries( df1 ).rolling( 7 ), False, False, False ),
+    '/empresa/rolling-28d': ( lambda df1: OrderSeries( df1 ).rolling( 28 ), False, False, False ),
+
+    '/entregadores/overall': ( metrics.courier_overall, True, False, False ),
+    '/entregadores/ratings': ( metrics.avg_ratings_by_deliver, True, True, False ),
+    '/entregadores/ratings-by-traffic': (
+        lambda df1: metrics.ratings_by( df1, 'Road_traffic_density' ), True, False, False ),
+    '/entregadores/ratings-by-weather': (
+        lambda df1: metrics.ratings_by( df1, 'Weatherconditions' ), True, False, False ),
+    '/entregadores/top-fastest': ( lambda df1: metrics.top_delivers( df1, top_asc=False ), True, False, False ),
+    '/entregadores/top-slowest': ( lambda df1: metrics.top_delivers( df1, top_asc=True ), True, False, False ),
+
+    '/restaurantes/overall': ( metrics.restaurant_overall, True, False, True ),
+    '/restaurantes/time-by-city': ( metrics.time_by_city, True, False, False ),
+    '/restaurantes/distance-by-city': ( metrics.distance_by_city, True, False, True ),
+    '/restaurantes/time-by-city-traffic': ( metrics.time_by_city_traffic, True, False, False ),
+    '/restaurantes/distance-by-restaurant': ( metrics.avg_distance_restaurant, True, True, True ),
+}
+
+
+class MetricsAPI:
+    """
+        Aplicação ASGI com as rotas de métricas ( GET e HEAD ).
+
+        O dataset limpo fica em memória e é recarregado quando a versão do
+        arquivo muda. A API é somente leitura: por padrão as linhas inválidas
+        são descartadas sem gravar a quarentena ( quarantine_dir=None ). O
+        resultado de cada métrica fica num cache LRU chaveado por ( versão,
+        rota, filtros ), e a paginação é feita sobre o resultado em cache. O
+        ETag depende só da versão, dos filtros normalizados e da página, então
+        um If-None-Match válido responde 304 sem calcular nada.
+    """
+
+    def __init__( self, path=DATASET_PATH, cache_size=CACHE_SIZE, quarantine_dir=None ):
+        self.path = path
+        self.quarantine_dir = quarantine_dir
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._version = None
+        self._df1 = None
+        self._cache = OrderedDict()
+
+    # ------------------ dados e cache ------------------
+
+    def dataset( self ):
+        version = data_version( self.path )
+
+        with self._lock:
+            if version != self._version:
+                self._df1 = load_data( self.path, self.quarantine_dir )
+                self._version = version
+                self._cache.clear()
+
+            return self._version, self._df1
+
+    def compute( self, route, filtros ):
+        version, df1 = self.dataset()
+        key = ( version, route, filtros )
+
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end( key )
+                return version, self._cache[key]
+
+        func, _, _, needs_distance = ROUTES[route]
+        date_limit, traffic_options, weather_options = filtros
+
+        df_aux = filter_data( df1, date_limit, list( traffic_options ),
+                              None if weather_options is None else list( weather_options ) )
+        if needs_distance:
+            df_aux = metrics.add_distance( df_aux )
+
+        payload = to_json_ready( func( df_aux ) )
+
+        with self._lock:
+            self._cache[key] = payload
+            while len( self._cache ) > self.cache_size:
+                self._cache.popitem( last=False )
+
+        return version, payload
+
+    # ------------------ parâmetros ------------------
+
+    def parse_filters( self, route, params ):
+        _, accepts_weather, _, _ = ROUTES[route]
+
+        try:
+            date_limit = datetime.strptime( params.get( 'date', DATE_LIMIT.strftime( '%Y-%m-%d' ) ), '%Y-%m-%d' )
+        except ValueError:
+            raise BadRequest( "Parâmetro 'date' deve estar no formato YYYY-MM-DD" )
+
+        traffic_options = split_values( params.get( 'traffic' ) ) or TRAFFIC_OPTIONS
+        invalidos = set( traffic_options ) - set( TRAFFIC_OPTIONS )
+        if invalidos:
+            raise BadRequest( f"Valores inválidos em 'traffic': {sorted( invalidos )}" )
+
+        weather_options = split_values( params.get( 'weather' ) )
+        if weather_options and not accepts_weather:
+            raise BadRequest( "Filtro 'weather' não se aplica às rotas da Visão Empresa" )
+        if accepts_weather and not weather_options:
+            _, df1 = self.dataset()
+            weather_options = df1['Weatherconditions'].unique()
+
+        return ( date_limit,
+                 tuple( sorted( traffic_options ) ),
+                 None if weather_options is None else tuple( sorted( weather_options ) ) )
+
+    # ------------------ ASGI ------------------
+
+    async def __call__( self, scope, receive, send ):
+        if scope['type'] == 'lifespan':
+            return await lifespan( receive, send )
+        if scope['type'] != 'http':
+            # websocket e outros tipos de conexão não são atendidos
+            return None
+
+        if scope['method'] not in ( 'GET', 'HEAD' ):
+            return await respond( send, 405, {'error': 'Método não permitido'}, scope )
+
+        route = scope['path'].rstrip( '/' ) or '/'
+        query = scope.get( 'query_string', b'' ).decode( 'latin-1' )
+
+        if route == '/':
+            return await respond( send, 200, {'routes': sorted( ROUTES )}, scope )
+        if route == '/health':
+            return await respond( send, 200, {'status': 'ok'}, scope )
+        if route not in ROUTES:
+            return await respond( send, 404, {'error': f'Rota não encontrada: {route}'}, scope )
+
+        params = {}
+        for name, value in parse_qsl( query ):
+            # Filtros repetidos ( ?traffic=Low&traffic=Jam ) são somados à lista;
+            # nos demais ( page, date... ) vale o último valor.
+            if name in LIST_PARAMS and name in params:
+                params[name] = f'{params[name]},{value}'
+            else:
+                params[name] = value
+
+        try:
+            filtros = await asyncio.to_thread( self.parse_filters, route, params )
+            page, page_size = parse_page( params ) if ROUTES[route][2] else ( None, None )
+        except BadRequest as e:
+            return await respond( send, 400, {'error': str( e )}, scope )
+
+        version = await asyncio.to_thread( data_version, self.path )
+        etag = make_etag( version, route, filtros, page, page_size )
+        if etag_matches( scope, etag ):
+            return await respond( send, 304, None, scope, etag=etag )
+
+        version, payload = await asyncio.to_thread( self.compute, route, filtros )
+        body = {'data_version': version}
+
+        if page is None:
+            body['data'] = payload
+        else:
+            inicio = ( page - 1 ) * page_size
+            body.update( {
+                'page': page,
+                'page_size': page_size,
+                'total': len( payload ),
+                'data': payload[inicio:inicio + page_size]
+            } )
+
+        return await respond( send, 200, body, scope, etag=make_etag( version, route, filtros, page, page_size ) )
+
+
+def split_values( value ):
+    if not value:
+        return None
+
+    return [v.strip() for v in value.split( ',' ) if v.strip()]
+
+def parse_page( params ):
+    try:
+        page = int( params.get( 'page', 1 ) )
+        page_size = int( params.get( 'page_size', PAGE_SIZE ) )
+    except ValueError:
+        raise BadRequest( "Parâmetros 'page' e 'page_size' devem ser inteiros" )
+
+    if page < 1 or not 1 <= page_size <= MAX_PAGE_SIZE:
+        raise BadRequest( f"Use page >= 1 e 1 <= page_size <= {MAX_PAGE_SIZE}" )
+
+    return page, page_size
+
+def make_etag( version, route, filtros, page, page_size ):
+    """
+        Esta função gera o ETag a partir dos filtros já normalizados ( listas
+        ordenadas, valores padrão preenchidos ), então 'traffic=Low,Jam' e
+        'traffic=Jam,Low' recebem o mesmo ETag.
+    """
+    chave = json.dumps( [version, route, filtros, page, page_size], default=str )
+
+    return '"' + hashlib.sha1( chave.encode() ).hexdigest() + '"'
+
+def etag_matches( scope, etag ):
+    for name, value in scope.get( 'headers', [] ):
+        if name == b'if-none-match':
+            tags = [t.strip() for t in value.decode( 'latin-1' ).split( ',' )]
+            return etag in tags or '*' in tags
+
+    return False
+
+async def respond( send, status, body, scope, etag=None ):
+    content = b'' if body is None else json.dumps( body, ensure_ascii=False ).encode()
+    headers = [( b'content-type', b'application/json; charset=utf-8' ),
+               ( b'cache-control', b'no-cache' )]
+    if etag is not None:
+        headers.append( ( b'etag', etag.encode() ) )
+    if status != 304:
+        headers.append( ( b'content-length', str( len( content ) ).encode() ) )
+
+    await send( {'type': 'http.response.start', 'status': status, 'headers': headers} )
+    await send( {'type': 'http.response.body',
+                 'body': b'' if scope['method'] == 'HEAD' or status == 304 else content} )
+
+async def lifespan( receive, send ):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send( {'type': 'lifespan.startup.complete'} )
+        elif message['type'] == 'lifespan.shutdown':
+            await send( {'type': 'lifespan.shutdown.complete'} )
+            return
+
+
+app = MetricsAPI()
+
+
+def main( argv=None ):
+    import uvicorn
+
+    parser = argparse.ArgumentParser( description='API de métricas do Growth Dashboard' )
+    parser.add_argument( '--host', default='127.0.0.1' )
+    parser.add_argument( '--port', type=int, default=8502 )
+    parser.add_argument( '--dataset', default=DATASET_PATH )
+    parser.add_argument( '--quarantine-dir', default=None,
+                         help='Grava as linhas inválidas nessa pasta ( padrão: não grava )' )
+    args = parser.parse_args( argv )
+
+    uvicorn.run( MetricsAPI( args.dataset, quarantine_dir=args.quarantine_dir ), host=args.host, port=args.port )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+    Gráficos das visões do dashboard.
+
+    Cada função recebe o dataframe filtrado, calcula a métrica com
+    dashboard.metrics e devolve a figura ( plotly ou folium ), sem desenhar
+    nada no Streamlit. As páginas desenham as figuras e o export
+    ( dashboard.export ) grava as mesmas figuras em HTML. plotly e folium são
+    importados dentro das funções, assim só entram no processo quando um
+    gráfico ou o mapa é gerado.
+"""
+import numpy as np
+
+from dashboard.metrics import (
+    city_traffic_location, distance_by_city, order_share_by_traffic, orders_by_city_traffic,
+    orders_by_day, orders_by_week, orders_per_courier_by_week, time_by_city, time_by_city_traffic
+)
+
+# ===========================================================
+#                      VISÃO EMPRESA
+# ===========================================================
+
+def order_metric( df1 ):
+    import plotly.express as px
+
+    df_aux = orders_by_day( df1 )
+    fig = px.bar(df_aux, x=df_aux.index, y='ID')
+
+    return fig
+
+def traffic_order_share( df1 ):
+    import plotly.express as px
+
+    df_aux = order_share_by_traffic( df1 )
+    fig = px.pie(df_aux, names=df_aux.index, values='ID')
+
+    return fig
+
+def traffic_order_city( df1 ):
+    import plotly.express as px
+
+    df_aux = orders_by_city_traffic( df1 )
+
+    fig = px.scatter(df_aux, x='City', y='Road_traffic_density', size='ID')
+    return fig
+
+def order_by_week( df1 ):
+    return weekly_orders_chart( orders_by_week( df1 ) )
+
+def order_share_by_week( df1 ):
+    return weekly_share_chart( orders_per_courier_by_week( df1 ) )
+
+def weekly_orders_chart( df_aux ):
+    """
+        Gráfico de pedidos por semana a partir da Series já agregada
+        ( metrics.orders_by_week ou OrderSeries.orders_by_week ).
+    """
+    import plotly.express as px
+
+    fig = px.line(df_aux, x=df_aux.index, y= 'ID')
+    return fig
+
+def weekly_share_chart( df_aux ):
+    """
+        Gráfico de pedidos por entregador por semana a partir do Dataframe já
+        agregado ( metrics.orders_per_courier_by_week ou OrderSeries ).
+    """
+    import plotly.express as px
+
+    fig = px.line(df_aux, x=df_aux.index, y='order_by_deliver')
+
+    return fig
+
+def country_maps( df1 ):
+    import folium as fl
+
+    df_aux = city_traffic_location( df1 )
+
+    map = fl.Map()
+
+    for i in range( len( df_aux ) ):
+        fl.Marker( [df_aux.loc[i, 'Delivery_location_latitude'],
+                        df_aux.loc[i, 'Delivery_location_longitude']],
+                        popup=df_aux.loc[i, 'City'] ).add_to( map )
+
+    return map
+
+# ===========================================================
+#                    VISÃO RESTAURANTES
+# ===========================================================
+
+def avg_delivery_city( df1 ):
+    import plotly.graph_objects as go
+
+    df_aux = time_by_city( df1 )
+
+    fig = go.Figure()
+    fig.add_trace( go.Bar( name='Control',
+                         x=df_aux['City'],
+                         y=df_aux['avg_time'],
+                         error_y=dict( type='data', array=df_aux['std_time'])
+                         )
+                 )
+
+    return fig
+
+def time_distribute( df1 ):
+    import plotly.graph_objects as go
+
+    avg_distance = distance_by_city( df1 )
+
+    fig = go.Figure(
+        data=[
+            go.Pie(
+                labels=avg_distance['City'],
+                values=avg_distance['distance'],
+                pull=[0, 0.1, 0]
+            )
+        ]
+    )
+    return fig
+
+def sunburst_chart( df1 ):
+    import plotly.express as px
+
+    df_aux = time_by_city_traffic( df1 )
+
+    fig = px.sunburst(df_aux, path=['City', 'Road_traffic_density'],
+                      values='avg_time', color='std_time', color_continuous_scale='RdBu',
+                      color_continuous_midpoint=np.average(df_aux['std_time'])
+                     )
+    return fig
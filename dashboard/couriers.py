@@ -0,0 +1,411 @@
+"""
+    Dimensão de entregadores com um array NumPy por atributo.
+
+    Cada entregador recebe um código inteiro ( a posição dele em `ids` ), e
+    os agregados ficam em arrays contíguos indexados por esse código:
+    quantidade de entregas, soma dos tempos, soma e quantidade de avaliações,
+    idade e condição do veículo ( mínimo e máximo ) e o último tipo de veículo.
+    Soma e quantidade de entregas por cidade ficam numa matriz cidade x
+    entregador. Novos lotes entram com update(), sem recalcular o que já foi
+    agregado, e stores do mesmo espaço de códigos se juntam com merge().
+
+    CourierCells monta, na carga dos dados, um store por combinação de
+    trânsito e clima; os filtros da barra lateral juntam as células
+    selecionadas em vez de reagregar os pedidos.
+
+    Uso ( confere o build completo, lotes incrementais e células, com filtros
+    sorteados, contra as funções de dashboard.metrics ):
+        python -m dashboard.couriers dataset/train-delivery.csv --batches 7 --samples 100
+"""
+import argparse
+import sys
+import numpy as np
+import pandas as pd
+
+from dashboard import metrics
+
+# Campos somados entre lotes e células, e o valor de um entregador sem pedidos
+ADDITIVE = ['deliveries', 'time_sum', 'rating_sum', 'rating_count']
+EXTREMES = {'age_min': np.fmin, 'age_max': np.fmax,
+            'condition_min': np.fmin, 'condition_max': np.fmax}
+EMPTY = dict( deliveries=0, time_sum=0, rating_sum=0, rating_count=0, age_min=np.nan, age_max=np.nan,
+              condition_min=np.nan, condition_max=np.nan, vehicle_type=-1 )
+
+
+class CourierStore:
+    """
+        Esta classe guarda os agregados por entregador.
+
+        Uso:
+            store = CourierStore()
+            store.update( df1 )                        # df1 limpo ( um ou mais lotes )
+            store.age_range()                          # ( menor, maior ) idade
+            store.ratings_page( 0, 50 )                # avaliação média, 50 entregadores
+            store.top_delivers( top_asc=False )        # == metrics.top_delivers
+    """
+
+    def __init__( self ):
+        self.ids = pd.Index( [], dtype=object )
+        self.cities = pd.Index( [], dtype=object )
+        self.vehicle_types = pd.Index( [], dtype=object )
+
+        self.deliveries = np.zeros( 0, dtype='int64' )
+        self.time_sum = np.zeros( 0, dtype='int64' )
+        # Avaliações em décimos ( 4.9 -> 49 ): a soma é exata em qualquer divisão de lotes,
+        # e a média sai de metrics.rating_mean, a mesma conta da API e do export
+        self.rating_sum = np.zeros( 0, dtype='int64' )
+        self.rating_count = np.zeros( 0, dtype='int64' )
+        self.age_min = np.zeros( 0, dtype='float64' )
+        self.age_max = np.zeros( 0, dtype='float64' )
+        self.condition_min = np.zeros( 0, dtype='float64' )
+        self.condition_max = np.zeros( 0, dtype='float64' )
+        self.vehicle_type = np.zeros( 0, dtype='int64' )
+
+        self.city_deliveries = np.zeros( ( 0, 0 ), dtype='int64' )
+        self.city_time_sum = np.zeros( ( 0, 0 ), dtype='int64' )
+
+        # Entregadores com pedidos, em ordem alfabética de ID
+        self._sorted = np.zeros( 0, dtype='int64' )
+
+    @classmethod
+    def from_frame( cls, df1 ):
+        store = cls()
+        store.update( df1 )
+
+        return store
+
+    def __len__( self ):
+        return len( self._sorted )
+
+    # ------------------ ingestão ------------------
+
+    def update( self, df1 ):
+        """
+            Esta função soma um lote de pedidos aos agregados.
+
+            Entregadores, cidades e tipos de veículo novos ganham um código no
+            final dos arrays; os códigos existentes não mudam.
+
+                Input: Dataframe limpo com os pedidos do lote
+                Output: O próprio store
+        """
+        self._grow( pd.Index( df1['Delivery_person_ID'].unique() ).difference( self.ids ),
+                    pd.Index( df1['City'].unique() ).difference( self.cities ) )
+        self.vehicle_types = self.vehicle_types.append(
+            pd.Index( df1['Type_of_vehicle'].unique() ).difference( self.vehicle_types ) )
+
+        n = len( self.ids )
+        codes = self.ids.get_indexer( df1['Delivery_person_ID'] )
+        tempo = df1['Time_taken(min)'].to_numpy( dtype='int64' )
+        avaliacao = df1['Delivery_person_Ratings'].to_numpy( dtype='float64' )
+        avaliada = ~np.isnan( avaliacao )
+
+        self.deliveries += np.bincount( codes, minlength=n )
+        self.time_sum += np.bincount( codes, weights=tempo, minlength=n ).astype( 'int64' )
+        self.rating_sum += np.bincount( codes[avaliada], weights=np.rint( avaliacao[avaliada] * 10 ),
+                                        minlength=n ).astype( 'int64' )
+        self.rating_count += np.bincount( codes[avaliada], minlength=n )
+
+        lote = pd.DataFrame( {
+            'code': codes,
+            'age': df1['Delivery_person_Age'].to_numpy( dtype='float64' ),
+            'condition': df1['Vehicle_condition'].to_numpy( dtype='float64' ),
+            'vehicle': self.vehicle_types.get_indexer( df1['Type_of_vehicle'] )
+        } ).groupby( 'code' ).agg(
+            age_min=( 'age', 'min' ), age_max=( 'age', 'max' ),
+            condition_min=( 'condition', 'min' ), condition_max=( 'condition', 'max' ),
+            vehicle=( 'vehicle', 'last' )
+        )
+        idx = lote.index.to_numpy()
+
+        # fmin/fmax ignoram NaN ( entregador sem idade ainda )
+        for nome, func in EXTREMES.items():
+            getattr( self, nome )[idx] = func( getattr( self, nome )[idx], lote[nome] )
+        self.vehicle_type[idx] = lote['vehicle']
+
+        cidade = self.cities.get_indexer( df1['City'] )
+        celula = cidade * n + codes
+        forma = ( len( self.cities ), n )
+        self.city_deliveries += np.bincount( celula, minlength=forma[0] * n ).reshape( forma )
+        self.city_time_sum += np.bincount( celula, weights=tempo,
+                                           minlength=forma[0] * n ).astype( 'int64' ).reshape( forma )
+
+        self._reindex()
+
+        return self
+
+    def empty_like( self ):
+        """
+            Esta função devolve um store vazio com os mesmos códigos de
+            entregadores, cidades e veículos, pronto para update() e merge().
+        """
+        store = CourierStore()
+        store.ids, store.cities, store.vehicle_types = self.ids, self.cities, self.vehicle_types
+        store._grow( pd.Index( [] ), pd.Index( [] ) )
+
+        for nome, vazio in EMPTY.items():
+            setattr( store, nome, np.full( len( self.ids ), vazio, dtype=getattr( self, nome ).dtype ) )
+
+        return store
+
+    def merge( self, *others ):
+        """
+            Esta função junta os agregados de outros stores com os mesmos
+            códigos ( ex.: criados com empty_like() ), como se os pedidos de
+            todos tivessem entrado no mesmo update().
+
+                Input: Stores com o mesmo espaço de códigos
+                Output: O próprio store
+        """
+        for other in others:
+            if not ( other.ids is self.ids and other.cities is self.cities ):
+                raise ValueError( 'merge exige stores com o mesmo espaço de códigos ( use empty_like )' )
+
+            for nome in ADDITIVE + ['city_deliveries', 'city_time_sum']:
+                np.add( getattr( self, nome ), getattr( other, nome ), out=getattr( self, nome ) )
+            for nome, func in EXTREMES.items():
+                func( getattr( self, nome ), getattr( other, nome ), out=getattr( self, nome ) )
+            self.vehicle_type = np.where( other.vehicle_type >= 0, other.vehicle_type, self.vehicle_type )
+
+        self._reindex()
+
+        return self
+
+    def _grow( self, novos_ids, novas_cidades ):
+        k = len( novos_ids )
+        if k:
+            self.ids = self.ids.append( novos_ids )
+            for nome, vazio in EMPTY.items():
+                atual = getattr( self, nome )
+                setattr( self, nome, np.concatenate( ( atual, np.full( k, vazio, dtype=atual.dtype ) ) ) )
+
+        n, c = len( self.ids ), len( self.cities ) + len( novas_cidades )
+        if len( novas_cidades ):
+            self.cities = self.cities.append( novas_cidades )
+        for nome in ( 'city_deliveries', 'city_time_sum' ):
+            atual = getattr( self, nome )
+            matriz = np.zeros( ( c, n ), dtype=atual.dtype )
+            matriz[:atual.shape[0], :atual.shape[1]] = atual
+            setattr( self, nome, matriz )
+
+    def _reindex( self ):
+        # Ordem alfabética dos entregadores com pedidos, usada na paginação
+        ativos = np.flatnonzero( self.deliveries > 0 )
+        self._sorted = ativos[np.argsort( self.ids.to_numpy( dtype=str )[ativos], kind='stable' )]
+
+    # ------------------ consultas ------------------
+
+    def age_range( self ):
+        if len( self ) == 0:
+            return np.nan, np.nan
+
+        return np.nanmin( self.age_min ), np.nanmax( self.age_max )
+
+    def condition_range( self ):
+        if len( self ) == 0:
+            return np.nan, np.nan
+
+        return int( np.nanmin( self.condition_min ) ), int( np.nanmax( self.condition_max ) )
+
+    def ratings_page( self, offset, limit ):
+        """
+            Esta função devolve a avaliação média de uma página de entregadores.
+
+            Só as linhas da página são montadas, em ordem alfabética de ID,
+            como no groupby de metrics.avg_ratings_by_deliver.
+
+                Input: Posição inicial e quantidade de entregadores
+                Output: Dataframe com Delivery_person_ID e Delivery_person_Ratings
+        """
+        pagina = self._sorted[offset:offset + limit]
+
+        df_aux = pd.DataFrame( {
+            'Delivery_person_ID': self.ids[pagina],
+            'Delivery_person_Ratings': metrics.rating_mean( self.rating_sum[pagina], self.rating_count[pagina] )
+        } )
+        df_aux.index = np.arange( offset, offset + len( pagina ) )
+
+        return df_aux
+
+    def top_delivers( self, top_asc=True ):
+        """
+            Esta função lista os 10 entregadores mais lentos ( top_asc=True ) ou
+            mais rápidos de cada cidade pelo tempo médio de entrega.
+
+                Output: Dataframe igual ao de metrics.top_delivers
+        """
+        with np.errstate( invalid='ignore', divide='ignore' ):
+            media = np.round( self.city_time_sum / self.city_deliveries, 2 )
+
+        ordem_id = np.zeros( len( self.ids ), dtype='int64' )
+        ordem_id[self._sorted] = np.arange( len( self ) )
+
+        partes = []
+        for c in np.argsort( self.cities.to_numpy( dtype=str ), kind='stable' ):
+            entregou = np.flatnonzero( self.city_deliveries[c] > 0 )
+            if len( entregou ) == 0:
+                continue
+            valores = media[c, entregou]
+
+            # Empates ficam na ordem alfabética de ID, como no nlargest/nsmallest
+            chave = -valores if top_asc else valores
+            top = entregou[np.lexsort( ( ordem_id[entregou], chave ) )[:10]]
+
+            partes.append( pd.DataFrame( {
+                'City': self.cities[c],
+                'Delivery_person_ID': self.ids[top],
+                'Time_taken(min)': media[c, top]
+            } ) )
+
+        if not partes:
+            return pd.DataFrame( columns=['City', 'Delivery_person_ID', 'Time_taken(min)'] )
+
+        return pd.concat( partes, ignore_index=True )
+
+
+class CourierCells:
+    """
+        Esta classe guarda um CourierStore por combinação de trânsito e clima.
+
+        As células são montadas uma vez, na carga dos dados, no mesmo espaço
+        de códigos; select() junta as células dos filtros com merge(), sem
+        passar pelos pedidos. O filtro de data não é uma dimensão das
+        células: select() devolve None quando a data limite corta pedidos, e
+        quem chama monta o store a partir do dataframe filtrado.
+
+        Uso:
+            cells = CourierCells( df1 )                # df1 limpo, sem filtros
+            cells.select( date_slider, traffic_options, weather_options )
+    """
+
+    def __init__( self, df1 ):
+        self.base = CourierStore.from_frame( df1 )
+        self.last_date = df1['Order_Date'].max()
+        self.cells = {
+            chave: self.base.empty_like().update( grupo )
+            for chave, grupo in df1.groupby( ['Road_traffic_density', 'Weatherconditions'] )
+        }
+
+    def covers( self, date_limit ):
+        """
+            Esta função diz se a data limite mantém todos os pedidos.
+        """
+        return date_limit is None or pd.isna( self.last_date ) or pd.Timestamp( date_limit ) > self.last_date
+
+    def select( self, date_limit, traffic_options, weather_options=None ):
+        """
+            Esta função junta as células dos filtros da barra lateral.
+
+                Input: Filtros como em data.filter_data
+                Output: CourierStore ( None se a data limite cortar pedidos )
+        """
+        if not self.covers( date_limit ):
+            return None
+
+        selecionadas = [
+            cell for ( traffic, weather ), cell in self.cells.items()
+            if traffic in traffic_options and ( weather_options is None or weather in weather_options )
+        ]
+
+        return self.base.empty_like().merge( *selecionadas )
+
+# ----------------------------------------
+#                CONFERÊNCIA
+# ----------------------------------------
+
+def compare( store, df1 ):
+    """
+        Esta função compara as consultas do store com dashboard.metrics.
+
+            Input: Store e o dataframe com os mesmos pedidos
+            Output: Lista com as consultas que divergiram
+    """
+    divergencias = []
+
+    esperado = metrics.avg_ratings_by_deliver( df1 ).reset_index( drop=True )
+    if not esperado.equals( store.ratings_page( 0, len( store ) ).reset_index( drop=True ) ):
+        divergencias.append( 'ratings_page' )
+
+    for top_asc in ( True, False ):
+        esperado = metrics.top_delivers( df1, top_asc=top_asc ).reset_index( drop=True )
+        obtido = store.top_delivers( top_asc=top_asc )
+        if not ( esperado.values.tolist() == obtido.values.tolist() ):
+            divergencias.append( f'top_delivers( top_asc={top_asc} )' )
+
+    overall = metrics.courier_overall( df1 )
+    if ( ( overall['menor_idade'], overall['maior_idade'] ) != store.age_range() or
+         ( overall['pior_condicao'], overall['melhor_condicao'] ) != store.condition_range() ):
+        divergencias.append( 'age_range / condition_range' )
+
+    return divergencias
+
+def random_filters( rng, df1 ):
+    """
+        Esta função sorteia filtros da barra lateral: subconjuntos de trânsito
+        e clima ( podem ser vazios ) e, em metade dos casos, uma data limite
+        dentro do período dos pedidos.
+    """
+    traffic = sorted( df1['Road_traffic_density'].unique() )
+    weather = sorted( df1['Weatherconditions'].unique() )
+    dias = pd.date_range( df1['Order_Date'].min(), df1['Order_Date'].max(), freq='D' )
+
+    date_limit = dias[rng.integers( len( dias ) )] if rng.random() < 0.5 else None
+    traffic_options = [t for t in traffic if rng.random() < 0.6]
+    weather_options = [w for w in weather if rng.random() < 0.6]
+
+    return date_limit, traffic_options, weather_options
+
+def main( argv=None ):
+    from dashboard.data import DATASET_PATH, filter_data, load_data
+
+    parser = argparse.ArgumentParser( description='Confere o CourierStore contra dashboard.metrics' )
+    parser.add_argument( 'dataset', nargs='?', default=DATASET_PATH )
+    parser.add_argument( '--batches', type=int, default=7,
+                         help='Quantidade de lotes do update incremental' )
+    parser.add_argument( '--samples', type=int, default=100,
+                         help='Quantidade de combinações de filtros sorteadas' )
+    parser.add_argument( '--seed', type=int, default=0 )
+    args = parser.parse_args( argv )
+
+    df1 = load_data( args.dataset, quarantine_dir=None )
+    rng = np.random.default_rng( args.seed )
+
+    def lotes( df_aux ):
+        store = CourierStore()
+        embaralhado = df_aux.sample( frac=1, random_state=int( rng.integers( 2 ** 31 ) ) )
+        for inicio in range( args.batches ):
+            store.update( embaralhado.iloc[inicio::args.batches] )
+        return store
+
+    cells = CourierCells( df1 )
+    casos = [
+        ( 'build completo', CourierStore.from_frame( df1 ), df1 ),
+        ( f'{args.batches} lotes', lotes( df1 ), df1 ),
+        ( 'células ( todas )', cells.select( None, df1['Road_traffic_density'].unique() ), df1 )
+    ]
+
+    # Filtros sorteados: o store montado como na página ( células ou dataframe
+    # filtrado ) e um store em lotes, ambos contra as métricas do pandas.
+    for _ in range( args.samples ):
+        date_limit, traffic_options, weather_options = random_filters( rng, df1 )
+        df_aux = filter_data( df1, date_limit, traffic_options, weather_options )
+        nome = ( f"{'-' if date_limit is None else date_limit.strftime( '%m-%d' )} "
+                 f"{','.join( traffic_options ) or '-'} {','.join( weather_options ) or '-'}" )
+
+        store = cells.select( date_limit, traffic_options, weather_options )
+        casos.append( ( nome, store if store is not None else CourierStore.from_frame( df_aux ), df_aux ) )
+        casos.append( ( f'{nome} ( lotes )', lotes( df_aux ), df_aux ) )
+
+    falhas = 0
+    for nome, store, df_aux in casos:
+        divergencias = compare( store, df_aux )
+        if divergencias:
+            falhas += 1
+            print( f'DIVERGE  {nome}: ' + ', '.join( divergencias ) )
+
+    print( f'{len( casos ) - falhas}/{len( casos )} casos iguais a dashboard.metrics' )
+
+    return 1 if falhas else 0
+
+if __name__ == '__main__':
+    sys.exit( main() )
@@ -0,0 +1,143 @@
+import logging
+import os
+import pandas as pd
+
+from datetime import datetime
+
+from dashboard.validation import COORDINATES, QUARANTINE_DIR, validate, write_quarantine
+
+logger = logging.getLogger( __name__ )
+
+DATASET_PATH = 'dataset/train-delivery.csv'
+
+# Valores padrão dos filtros da barra lateral
+DATE_LIMIT = datetime( 2022, 4, 13 )
+DATE_MIN = datetime( 2022, 2, 11 )
+DATE_MAX = datetime( 2022, 4, 6 )
+TRAFFIC_OPTIONS = ['Low', 'Medium', 'High', 'Jam']
+
+# ----------------------------------------
+#                FUNÇÕES
+# ----------------------------------------
+
+def clean_data( df1 ):
+    """
+        Esta função tem a responsabilidade de limpar o dataframe
+
+        Tipos de Limpeza:
+            1. Remoção dos dados NaN
+            2. Mudança do tipo da coluna de dados
+            3. Remoção dos espaços das variáveis de texto
+            4. Formatação da coluna de datas
+            5. Limpeza da coluna de tempo ( remoção do texto da variável numérica )
+
+            Input: Dataframe
+            Output: Dataframe
+    """
+
+    ## 1. Selecionando as linhas que estão sem NaN
+    cols = ['City', 'Festival', 'Road_traffic_density', 'Weatherconditions']
+    df1[cols] = df1[cols].replace('NaN ', pd.NA)
+    df1 = df1[
+        (df1['City'].notna()) & (df1['Festival'].notna()) &
+        (df1['Road_traffic_density'].notna()) & (df1['Weatherconditions'].notna())
+    ]
+
+    ## 2. Eliminando os espaços vazios ao final dos valores.
+    cols_to_strip = [
+        'ID', 'Delivery_person_ID', 'Road_traffic_density', 'Type_of_order',
+        'Type_of_vehicle', 'Festival', 'City']
+    df1[cols_to_strip] = df1[cols_to_strip].apply(lambda x: x.str.strip())
+
+    ## 3. Transformando o tipo das colunas adequadamente
+    cols_to_convert = ['Delivery_person_Age', 'Delivery_person_Ratings', 'multiple_deliveries']
+    df1[cols_to_convert] = df1[cols_to_convert].apply(pd.to_numeric, errors='coerce')
+
+    # Colunas já checadas em dashboard.validation, mas que podem ter ficado como texto
+    # quando uma linha com valor inválido ( ex.: latitude 'abc' ) foi para a quarentena.
+    cols_to_convert = list( COORDINATES )
+    df1[cols_to_convert] = df1[cols_to_convert].apply(pd.to_numeric)
+    df1['Vehicle_condition'] = pd.to_numeric(df1['Vehicle_condition']).astype('int64')
+    df1['Order_Date'] = pd.to_datetime(df1['Order_Date'], format='%d-%m-%Y')
+
+    ## 4. Retirando sujeiros nos valores de algumas colunas
+    df1['Weatherconditions'] = ( df1['Weatherconditions']
+                                    .apply(lambda x: x.split()[-1]) )
+    df1['Time_taken(min)'] = df1['Time_taken(min)'].apply(lambda x: x.split()[-1])
+    df1['Time_taken(min)'] = pd.to_numeric(df1['Time_taken(min)']).astype('int64')
+
+    ## 5. Criação da coluna 'week_of_year
+    df1['week_of_year'] = df1['Order_Date'].dt.strftime( '%U' ).astype('int64')
+
+    return df1
+
+def ingest( df, quarantine_dir=QUARANTINE_DIR ):
+    """
+        Esta função valida o dataframe bruto e limpa as linhas válidas.
+
+        As linhas que falham nas regras do schema ( dashboard.validation ) vão
+        para a quarentena com os códigos dos motivos, e a contagem de falhas
+        por regra é registrada no log. O dataframe recebido não é alterado.
+
+            Input: Dataframe bruto e pasta da quarentena ( None não grava arquivos )
+            Output: Dataframe limpo
+    """
+    valid, quarantine, counters = validate( df )
+
+    for regra, quantidade in counters.items():
+        logger.info( 'validação %s: %d linhas', regra, quantidade )
+    if quarantine_dir is not None:
+        write_quarantine( quarantine, quarantine_dir )
+
+    return clean_data( valid )
+
+def load_data( path=DATASET_PATH, quarantine_dir=QUARANTINE_DIR ):
+    """
+        Esta função lê o dataset e devolve o dataframe já validado e limpo.
+
+            Input: Caminho do csv e pasta da quarentena ( None não grava arquivos )
+            Output: Dataframe
+    """
+    df = pd.read_csv( path )
+
+    return ingest( df, quarantine_dir )
+
+def data_version( path=DATASET_PATH ):
+    """
+        Esta função identifica a versão do dataset pelo tamanho e data de modificação.
+
+        Muda sempre que o arquivo é substituído, e serve de chave para caches e ETags.
+
+            Input: Caminho do csv
+            Output: String com a versão
+    """
+    stat = os.stat( path )
+
+    return f'{stat.st_mtime_ns:x}-{stat.st_size:x}'
+
+def filter_data( df1, date_limit, traffic_options, weather_options=None ):
+    """
+        Esta função aplica os filtros da barra lateral.
+
+            Input:
+                - df1: Dataframe limpo
+                - date_limit: Mantém os pedidos anteriores a essa data ( None não filtra )
+                - traffic_options: Densidades de trânsito selecionadas
+                - weather_options: Condições de clima selecionadas ( None não filtra )
+            Output: Dataframe filtrado
+    """
+    # Filtro de data
+    if date_limit is not None:
+        linhas_selecionadas = df1['Order_Date'] < date_limit
+        df1 = df1.loc[linhas_selecionadas, : ]
+
+    # Filtro de transito
+    linhas_selecionadas = df1['Road_traffic_density'].isin( traffic_options )
+    df1 = df1.loc[linhas_selecionadas, : ]
+
+    # Filtro de clima
+    if weather_options is not None:
+        linhas_selecionadas = df1['Weatherconditions'].isin( weather_options )
+        df1 = df1.loc[linhas_selecionadas, : ]
+
+    return df1
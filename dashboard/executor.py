@@ -0,0 +1,70 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Pool compartilhado pelo processo: sobrevive aos reruns e às sessões do Streamlit.
+_POOL = ThreadPoolExecutor( thread_name_prefix='dashboard' )
+
+# ----------------------------------------
+#                FUNÇÕES
+# ----------------------------------------
+
+def metric( label ):
+    """
+        Renderizador que desenha o resultado como st.metric com o rótulo informado.
+    """
+    return lambda slot, valor: slot.metric( label, valor )
+
+def plotly_chart():
+    """
+        Renderizador que desenha a figura plotly ocupando a largura do container.
+    """
+    return lambda slot, fig: slot.plotly_chart( fig, use_container_width=True )
+
+def dataframe( **kwargs ):
+    """
+        Renderizador que desenha o resultado como st.dataframe ( kwargs repassados ).
+    """
+    return lambda slot, df_aux: slot.dataframe( df_aux, **kwargs )
+
+
+class PageExecutor:
+    """
+        Esta classe executa em paralelo os cálculos independentes de uma página.
+
+        Cada cálculo é submetido ao pool de threads junto com um placeholder
+        ( st.empty ) que já ocupa o seu lugar no layout. Os placeholders são
+        preenchidos na thread principal, na ordem em que os resultados ficam
+        prontos, então o tempo do rerun tende ao do widget mais lento e não à
+        soma de todos. As funções submetidas não devem alterar o dataframe
+        recebido, pois ele é compartilhado entre as threads.
+
+        Uso:
+            executor = PageExecutor()
+            executor.submit( col1.empty(), metric( 'Distância Média' ), distance, df1 )
+            executor.run()
+    """
+
+    def __init__( self, placeholder='Calculando...' ):
+        self.placeholder = placeholder
+        self._tarefas = {}
+
+    def submit( self, slot, render, func, *args, **kwargs ):
+        slot.caption( self.placeholder )
+        future = _POOL.submit( func, *args, **kwargs )
+        self._tarefas[future] = ( slot, render )
+
+        return future
+
+    def run( self ):
+        # Os comandos do Streamlit só podem ser chamados da thread do script.
+        for future in as_completed( self._tarefas ):
+            slot, render = self._tarefas[future]
+
+            # Uma falha aparece só no seu placeholder; os outros continuam sendo preenchidos.
+            try:
+                render( slot, future.result() )
+            except Exception as e:
+                slot.exception( e )
+
+        self._tarefas = {}
+
+        return None
@@ -0,0 +1,269 @@
+"""
+    Export estático das visões do dashboard.
+
+    Roda as mesmas funções de métricas e gráficos das páginas, sem Streamlit,
+    com os filtros padrão da barra lateral, e grava para cada aba:
+        <pasta>/<visão>/<aba>.html   Página autocontida ( plotly.js embutido )
+        <pasta>/<visão>/<aba>.json   Dados das métricas, tabelas e gráficos
+    além de um index.html e de um manifest.json com a versão dos dados. O
+    export é pulado quando a versão dos dados não mudou desde o último.
+
+    A exceção é o mapa ( visao_geografica.html ): o HTML do folium carrega
+    Leaflet, jQuery, Bootstrap e awesome-markers de CDNs públicos, então
+    só abre com acesso à internet. Os dados do mapa ficam no .json.
+
+    Uso:
+        python -m dashboard.export --out snapshots
+        python -m dashboard.export --out snapshots --force
+        python -m dashboard.export --out snapshots --quarantine-dir dataset/quarantine
+"""
+import argparse
+import html
+import json
+import shutil
+import sys
+import pandas as pd
+
+from datetime import datetime
+from pathlib import Path
+
+from dashboard import charts, metrics
+from dashboard.data import DATASET_PATH, DATE_LIMIT, TRAFFIC_OPTIONS, data_version, filter_data, ingest
+from dashboard.serialization import to_json_ready
+
+OUT_DIR = 'snapshots'
+
+CSS = '''
+body { font-family: sans-serif; margin: 2rem; color: #31333f; }
+.metrics { display: flex; flex-wrap: wrap; gap: 2rem; margin-bottom: 2rem; }
+.metric .label { font-size: .9rem; color: #808495; }
+.metric .value { font-size: 2rem; }
+table { border-collapse: collapse; font-size: .85rem; }
+th, td { border: 1px solid #e6e9ef; padding: .25rem .5rem; text-align: right; }
+'''
+
+# ----------------------------------------
+#                FUNÇÕES
+# ----------------------------------------
+
+def overall( func, chave ):
+    """
+        Esta função devolve o widget de um KPI dos dicts de métricas
+        ( metrics.courier_overall, metrics.restaurant_overall ), os mesmos da API.
+    """
+    return lambda df1: func( df1 )[chave]
+
+def snapshot_pages( df ):
+    """
+        Esta função descreve as visões e abas exportadas.
+
+        Cada widget é ( título, dados, gráfico ): 'dados' recebe o dataframe
+        filtrado e devolve o valor, a tabela ou os dados do gráfico; 'gráfico'
+        recebe o mesmo dataframe e devolve a figura ( None para métricas e
+        tabelas ). Abas com o mapa usam 'map' no lugar da lista de widgets.
+
+            Input: Dataframe bruto ( o KPI de entregadores únicos usa o dataset inteiro )
+            Output: dict { visão: { 'title', 'weather', 'distance', 'tabs' } }
+    """
+    return {
+        'visao_empresa': {
+            'title': 'Marketplace - Visão Cliente',
+            'weather': False,
+            'distance': False,
+            'tabs': {
+                'visao_gerencial': [
+                    ( 'Orders by Day', metrics.orders_by_day, charts.order_metric ),
+                    ( 'Traffic Order Share', metrics.order_share_by_traffic, charts.traffic_order_share ),
+                    ( 'Traffic Order City', metrics.orders_by_city_traffic, charts.traffic_order_city )
+                ],
+                'visao_tatica': [
+                    ( 'Order by Week', metrics.orders_by_week, charts.order_by_week ),
+                    ( 'Order Share by Week', metrics.orders_per_courier_by_week, charts.order_share_by_week )
+                ],
+                'visao_geografica': {
+                    'map': ( 'Country Maps', metrics.city_traffic_location, charts.country_maps )
+                }
+            }
+        },
+        'visao_entregadores': {
+            'title': 'Marketplace - Visão Entregadores',
+            'weather': True,
+            'distance': False,
+            'tabs': {
+                'visao_gerencial': [
+                    ( 'Maior de Idade', overall( metrics.courier_overall, 'maior_idade' ), None ),
+                    ( 'Menor de Idade', overall( metrics.courier_overall, 'menor_idade' ), None ),
+                    ( 'Melhor Condição', overall( metrics.courier_overall, 'melhor_condicao' ), None ),
+                    ( 'Pior Condição', overall( metrics.courier_overall, 'pior_condicao' ), None ),
+                    ( 'Avaliação Média por Entregador', metrics.avg_ratings_by_deliver, None ),
+                    ( 'Avaliação Média por Trânsito',
+                      lambda df1: metrics.ratings_by( df1, 'Road_traffic_density' ), None ),
+                    ( 'Avaliação Média por Clima',
+                      lambda df1: metrics.ratings_by( df1, 'Weatherconditions' ), None ),
+                    ( 'Top Entregadores mais Rápidos',
+                      lambda df1: metrics.top_delivers( df1, top_asc=False ), None ),
+                    ( 'Top Entregadores mais Lentos',
+                      lambda df1: metrics.top_delivers( df1, top_asc=True ), None )
+                ]
+            }
+        },
+        'visao_restaurantes': {
+            'title': 'Marketplace - Visão Restaurantes',
+            'weather': True,
+            'distance': True,
+            'tabs': {
+                'visao_gerencial': [
+                    ( 'Entregadores Únicos', lambda df1: df['Delivery_person_ID'].nunique(), None ),
+                    ( 'Distância Média', overall( metrics.restaurant_overall, 'distancia_media' ), None ),
+                    ( 'Tempo Médio de Entrega c/ Festival',
+                      overall( metrics.restaurant_overall, 'tempo_medio_festival' ), None ),
+                    ( 'Std de Entrega c/ Festival',
+                      overall( metrics.restaurant_overall, 'std_tempo_festival' ), None ),
+                    ( 'Tempo Médio s/ Festival',
+                      overall( metrics.restaurant_overall, 'tempo_medio_sem_festival' ), None ),
+                    ( 'Std de Entrega s/ Festival',
+                      overall( metrics.restaurant_overall, 'std_tempo_sem_festival' ), None ),
+                    ( 'Tempo Médio de entrega por cidade', metrics.time_by_city, charts.avg_delivery_city ),
+                    ( 'Média de distancia do restaurantes', metrics.avg_distance_restaurant, None ),
+                    ( 'Distribuição do Tempo', metrics.distance_by_city, charts.time_distribute ),
+                    ( 'Tempo por Cidade e Trânsito', metrics.time_by_city_traffic, charts.sunburst_chart )
+                ]
+            }
+        }
+    }
+
+def render_tab( title, widgets, df1 ):
+    """
+        Esta função calcula os widgets de uma aba e monta o HTML e o JSON.
+
+            Input: Título da página, lista de widgets e dataframe filtrado
+            Output: ( html, dict com os dados de cada widget )
+    """
+    cards, blocos, dados = [], [], {}
+    plotlyjs = True   # plotly.js é embutido só no primeiro gráfico do arquivo
+
+    for titulo, func, grafico in widgets:
+        valor = func( df1 )
+        dados[titulo] = to_json_ready( valor )
+
+        if grafico is not None:
+            fig = grafico( df1 )
+            blocos.append( f'<h2>{html.escape( titulo )}</h2>' +
+                           fig.to_html( full_html=False, include_plotlyjs=plotlyjs ) )
+            plotlyjs = False
+        elif isinstance( valor, ( pd.DataFrame, pd.Series ) ):
+            tabela = valor.to_frame() if isinstance( valor, pd.Series ) else valor
+            blocos.append( f'<h2>{html.escape( titulo )}</h2>' + tabela.to_html() )
+        else:
+            cards.append( f'<div class="metric"><div class="label">{html.escape( titulo )}</div>'
+                          f'<div class="value">{html.escape( str( dados[titulo] ) )}</div></div>' )
+
+    corpo = f'<h1>{html.escape( title )}</h1>'
+    if cards:
+        corpo += '<div class="metrics">' + ''.join( cards ) + '</div>'
+    corpo += ''.join( blocos )
+
+    pagina = ( '<!DOCTYPE html><html><head><meta charset="utf-8">'
+               f'<title>{html.escape( title )}</title><style>{CSS}</style></head>'
+               f'<body>{corpo}</body></html>' )
+
+    return pagina, dados
+
+def export( out_dir=OUT_DIR, path=DATASET_PATH, force=False, quarantine_dir=None ):
+    """
+        Esta função grava os snapshots de todas as visões.
+
+        Os arquivos são gerados numa pasta temporária e trocados de uma vez no
+        final, então quem serve a pasta nunca vê um export pela metade.
+
+            Input: Pasta de destino, caminho do dataset, se deve ignorar a versão e
+                   pasta da quarentena ( None não grava arquivos )
+            Output: Caminho do manifest.json ( None se os dados não mudaram )
+    """
+    out_dir = Path( out_dir )
+    version = data_version( path )
+
+    manifest_path = out_dir / 'manifest.json'
+    if not force and manifest_path.exists():
+        if json.loads( manifest_path.read_text() ).get( 'data_version' ) == version:
+            return None
+
+    df = pd.read_csv( path )
+    df1 = ingest( df, quarantine_dir )
+
+    tmp_dir = out_dir.with_name( out_dir.name + '.tmp' )
+    shutil.rmtree( tmp_dir, ignore_errors=True )
+    tmp_dir.mkdir( parents=True )
+
+    weather_options = df1['Weatherconditions'].unique()
+    arquivos = []
+
+    for pagina, spec in snapshot_pages( df ).items():
+        df_aux = filter_data( df1, DATE_LIMIT, TRAFFIC_OPTIONS,
+                              weather_options if spec['weather'] else None )
+        if spec['distance']:
+            df_aux = metrics.add_distance( df_aux )
+
+        ( tmp_dir / pagina ).mkdir()
+
+        for aba, widgets in spec['tabs'].items():
+            destino = tmp_dir / pagina / aba
+
+            if isinstance( widgets, dict ):
+                titulo, func, mapa = widgets['map']
+                mapa( df_aux ).save( str( destino.with_suffix( '.html' ) ) )
+                dados = {titulo: to_json_ready( func( df_aux ) )}
+            else:
+                pagina_html, dados = render_tab( spec['title'], widgets, df_aux )
+                destino.with_suffix( '.html' ).write_text( pagina_html, encoding='utf-8' )
+
+            destino.with_suffix( '.json' ).write_text(
+                json.dumps( dados, ensure_ascii=False ), encoding='utf-8' )
+            arquivos.append( f'{pagina}/{aba}' )
+
+    links = ''.join( f'<li><a href="{a}.html">{a}</a> ( <a href="{a}.json">json</a> )</li>'
+                     for a in arquivos )
+    ( tmp_dir / 'index.html' ).write_text(
+        f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>Curry Company</title>'
+        f'<style>{CSS}</style></head><body><h1>Curry Company Growth Dashboard</h1>'
+        f'<ul>{links}</ul></body></html>', encoding='utf-8' )
+
+    ( tmp_dir / 'manifest.json' ).write_text( json.dumps( {
+        'data_version': version,
+        'generated_at': datetime.now().isoformat( timespec='seconds' ),
+        'filters': {
+            'date': DATE_LIMIT.strftime( '%Y-%m-%d' ),
+            'traffic': TRAFFIC_OPTIONS,
+            'weather': sorted( weather_options )
+        },
+        'files': arquivos
+    }, ensure_ascii=False, indent=2 ) )
+
+    old_dir = out_dir.with_name( out_dir.name + '.old' )
+    shutil.rmtree( old_dir, ignore_errors=True )
+    if out_dir.exists():
+        out_dir.rename( old_dir )
+    tmp_dir.rename( out_dir )
+    shutil.rmtree( old_dir, ignore_errors=True )
+
+    return manifest_path
+
+def main( argv=None ):
+    parser = argparse.ArgumentParser( description='Export estático do Growth Dashboard' )
+    parser.add_argument( '--out', default=OUT_DIR )
+    parser.add_argument( '--dataset', default=DATASET_PATH )
+    parser.add_argument( '--force', action='store_true',
+                         help='Exporta mesmo se a versão dos dados não mudou' )
+    parser.add_argument( '--quarantine-dir', default=None,
+                         help='Grava as linhas inválidas nessa pasta ( padrão: não grava )' )
+    args = parser.parse_args( argv )
+
+    manifest = export( args.out, args.dataset, args.force, args.quarantine_dir )
+    print( f'Snapshots gravados em {args.out}' if manifest else
+           'Dados sem alteração desde o último export' )
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit( main() )
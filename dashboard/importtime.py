@@ -0,0 +1,113 @@
+"""
+    Relatório de tempo de import das páginas ( estilo `python -X importtime` ).
+
+    Para cada página, os imports de nível de módulo são executados em um
+    interpretador novo com `-X importtime`, e o relatório mostra o tempo total
+    de import e os pacotes mais caros. Imports feitos dentro das funções
+    ( plotly, folium, haversine... ) ficam de fora, pois só acontecem quando o
+    código que precisa deles é executado.
+
+    Uso:
+        python -m dashboard.importtime
+        python -m dashboard.importtime pages/1_Visao_Empresa.py --top 5
+        python -m dashboard.importtime --modules plotly.express folium
+"""
+import argparse
+import ast
+import re
+import subprocess
+import sys
+
+from pathlib import Path
+
+ROOT = Path( __file__ ).resolve().parent.parent
+PAGES = [ROOT / 'Home.py'] + sorted( ( ROOT / 'pages' ).glob( '*.py' ) )
+
+# import time: self [us] | cumulative | imported package
+LINHA = re.compile( r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$' )
+
+# ----------------------------------------
+#                FUNÇÕES
+# ----------------------------------------
+
+def top_level_imports( script_path ):
+    """
+        Esta função retorna os comandos de import de nível de módulo de um script.
+
+            Input: Caminho do script
+            Output: Lista com o código-fonte de cada import
+    """
+    source = Path( script_path ).read_text( encoding='utf-8' )
+    tree = ast.parse( source )
+
+    return [ast.get_source_segment( source, node ) for node in tree.body
+            if isinstance( node, ( ast.Import, ast.ImportFrom ) )]
+
+def import_profile( statements ):
+    """
+        Esta função executa os imports em um processo novo com -X importtime.
+
+            Input: Lista de comandos de import
+            Output: Lista de dicts com self_us, cumulative_us,
+                    depth e module, na ordem em que os módulos terminaram de carregar
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', '\n'.join( statements )],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+
+    registros = []
+    for linha in result.stderr.splitlines():
+        match = LINHA.match( linha )
+        if match is None:
+            continue
+
+        self_us, cumulative_us, indent, module = match.groups()
+        registros.append( {
+            'self_us': int( self_us ),
+            'cumulative_us': int( cumulative_us ),
+            'depth': len( indent ) // 2,
+            'module': module
+        } )
+
+    return registros
+
+def report( name, registros, top ):
+    """
+        Esta função formata o relatório de um script ou conjunto de módulos.
+    """
+    # Só os imports de profundidade 0 somam o tempo total sem contar duas vezes.
+    raiz = [r for r in registros if r['depth'] == 0]
+    total_ms = sum( r['cumulative_us'] for r in raiz ) / 1000
+
+    linhas = [f'{name}: {total_ms:.1f} ms ( {len( registros )} módulos )']
+    for r in sorted( raiz, key=lambda r: r['cumulative_us'], reverse=True )[:top]:
+        linhas.append( f"    {r['cumulative_us'] / 1000:>9.1f} ms  {r['module']}" )
+
+    return '\n'.join( linhas )
+
+def main( argv=None ):
+    parser = argparse.ArgumentParser( description=__doc__.splitlines()[1].strip() )
+    parser.add_argument( 'scripts', nargs='*', type=Path, default=PAGES,
+                         help='Scripts a perfilar ( padrão: Home.py e pages/*.py )' )
+    parser.add_argument( '--modules', nargs='+', default=[],
+                         help='Perfila módulos avulsos em vez dos scripts' )
+    parser.add_argument( '--top', type=int, default=10,
+                         help='Quantidade de pacotes listados por script' )
+    args = parser.parse_args( argv )
+
+    if args.modules:
+        for module in args.modules:
+            registros = import_profile( [f'import {module}'] )
+            print( report( module, registros, args.top ) )
+        return 0
+
+    for script in args.scripts:
+        registros = import_profile( top_level_imports( script ) )
+        print( report( Path( script ).name, registros, args.top ) )
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit( main() )
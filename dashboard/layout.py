@@ -0,0 +1,67 @@
+import pandas as pd
+import streamlit as st
+
+from dashboard.data import DATASET_PATH, ingest
+
+# ----------------------------------------
+#                FUNÇÕES
+# ----------------------------------------
+
+@st.cache_resource
+def load_image( image_path ):
+    """
+        Esta função abre e decodifica uma imagem estática uma única vez por processo.
+
+        O resultado fica no cache de recursos do Streamlit e é reaproveitado por
+        todas as sessões e reruns, em vez de reabrir o arquivo a cada execução.
+        O PIL só é importado na primeira chamada.
+
+            Input: Caminho da imagem
+            Output: PIL.Image já carregada em memória
+    """
+    from PIL import Image
+
+    image = Image.open( image_path )
+    image.load()
+
+    return image
+
+@st.cache_resource( max_entries=2 )
+def load_dataset( version, path=DATASET_PATH ):
+    """
+        Esta função lê, valida e limpa o dataset uma única vez por versão dos dados.
+
+        A validação, a quarentena e a limpeza rodam só quando o arquivo muda
+        ( version vem de data_version ), e não a cada rerun de cada sessão.
+        Os dataframes são compartilhados entre as sessões, então as páginas
+        não podem alterá-los: os filtros e o add_distance devolvem cópias.
+
+            Input: Versão do dataset e caminho do csv
+            Output: ( dataframe bruto, dataframe limpo )
+    """
+    df = pd.read_csv( path )
+
+    return df, ingest( df )
+
+def lazy_tabs( labels, key ):
+    """
+        Esta função substitui o st.tabs por um seletor horizontal de abas.
+
+        O st.tabs executa o corpo de todas as abas a cada rerun, mesmo as que
+        estão escondidas. Com o seletor, a página executa apenas o bloco da
+        aba ativa, e os gráficos das outras abas não são calculados.
+
+            Input:
+                - labels: Lista com os nomes das abas
+                - key: Chave do widget, mantém a aba selecionada entre os reruns
+            Output:
+                - Índice ( int ) da aba ativa
+    """
+    return st.radio(
+        'Abas',
+        options=range( len( labels ) ),
+        format_func=lambda i: labels[i],
+        horizontal=True,
+        label_visibility='collapsed',
+        key=key
+    )
@@ -0,0 +1,235 @@
+"""
+    Métricas das visões do dashboard.
+
+    As funções recebem o dataframe já limpo e filtrado e devolvem apenas dados
+    ( Series, Dataframes ou escalares ). Os gráficos ficam nas páginas, e a API
+    ( dashboard.api ) usa as mesmas funções. Nenhuma função altera o dataframe
+    recebido, pois ele é compartilhado entre as threads do PageExecutor.
+"""
+import numpy as np
+import pandas as pd
+
+# ===========================================================
+#                      VISÃO EMPRESA
+# ===========================================================
+
+def orders_by_day( df1 ):
+    df_aux = df1.groupby('Order_Date')['ID'].count()
+
+    return df_aux
+
+def order_share_by_traffic( df1 ):
+    df_aux = df1.groupby('Road_traffic_density')['ID'].count()
+    df_aux = ((df_aux / df_aux.sum()) * 100).round(2)
+
+    return df_aux
+
+def orders_by_city_traffic( df1 ):
+    df_aux = df1.groupby(['City', 'Road_traffic_density'])['ID'].count()
+    df_aux = df_aux.reset_index()
+
+    return df_aux
+
+def orders_by_week( df1 ):
+    df_aux = df1.groupby('week_of_year')['ID'].count()
+
+    return df_aux
+
+def orders_per_courier_by_week( df1 ):
+    qnt_entregas_por_semana = df1.groupby( 'week_of_year' )['ID'].count()
+    entregadores_unicos_por_semana = df1[['Delivery_person_ID', 'week_of_year' ]].groupby( 'week_of_year' ).nunique()
+
+    df_aux = pd.concat([ qnt_entregas_por_semana, entregadores_unicos_por_semana ], axis=1)
+    df_aux['order_by_deliver'] = (df_aux['ID'] / df_aux['Delivery_person_ID']).round(2)
+
+    return df_aux
+
+def city_traffic_location( df1 ):
+    cols = ['City', 'Road_traffic_density', 'Delivery_location_latitude', 'Delivery_location_longitude']
+    df_aux = ( df1[cols].groupby( ['City', 'Road_traffic_density'] )
+                        .median()
+                        .reset_index()
+              )
+
+    return df_aux
+
+# ===========================================================
+#                    VISÃO ENTREGADORES
+# ===========================================================
+
+def courier_overall( df1 ):
+    return {
+        'maior_idade': df1['Delivery_person_Age'].max(),
+        'menor_idade': df1['Delivery_person_Age'].min(),
+        'melhor_condicao': df1['Vehicle_condition'].max(),
+        'pior_condicao': df1['Vehicle_condition'].min()
+    }
+
+def top_delivers( df1, top_asc=True ):
+    media_tempo_por_city_entregador = df1.groupby(
+    ['City', 'Delivery_person_ID'])['Time_taken(min)'].mean().round(2)
+
+    df_aux = media_tempo_por_city_entregador.groupby(
+        'City', group_keys=False)
+
+    if top_asc == True:
+        return df_aux.nlargest(10).reset_index()
+
+    return df_aux.nsmallest(10).reset_index()
+
+def rating_mean( decimos, quantidade ):
+    """
+        Esta função calcula a avaliação média a partir da soma em décimos.
+
+        As avaliações têm uma casa decimal ( regra precision: da validação ),
+        então a soma em décimos é exata e não depende da ordem dos pedidos.
+        A página ( dashboard.couriers ), a API e o export usam esta mesma
+        conta e arredondam os empates ( ex.: 3.975 ) do mesmo jeito.
+
+            Input: Soma das avaliações em décimos e quantidade de avaliações
+            Output: Média arredondada em 2 casas ( NaN sem avaliações )
+    """
+    with np.errstate( invalid='ignore', divide='ignore' ):
+        return np.round( ( decimos / 10 ) / quantidade, 2 )
+
+def avg_ratings_by_deliver( df1 ):
+    decimos = ( df1['Delivery_person_Ratings'] * 10 ).round()
+    df_aux = decimos.groupby( df1['Delivery_person_ID'] ).agg( ['sum', 'count'] )
+
+    df_aux = ( rating_mean( df_aux['sum'], df_aux['count'] )
+                  .rename( 'Delivery_person_Ratings' )
+                  .reset_index() )
+
+    return df_aux
+
+def ratings_by( df1, agg ):
+    df_aux = ( df1.groupby(agg)
+                  .agg( { 'Delivery_person_Ratings': ['mean', 'std'] })
+                  .round(2) )
+
+    df_aux.columns = ['mean', 'std']
+    return df_aux
+
+# ===========================================================
+#                    VISÃO RESTAURANTES
+# ===========================================================
+
+def generate_point_id(row):
+    return hash((row['Restaurant_latitude'], row['Restaurant_longitude']))
+
+def add_distance( df1 ):
+    """
+        Esta função adiciona a coluna 'distance' ( km entre restaurante e local de entrega ).
+
+        O cálculo é vetorizado e feito uma única vez, antes das métricas que
+        dependem da distância, para que elas apenas leiam a coluna.
+
+            Input: Dataframe
+            Output: Dataframe ( cópia ) com a coluna 'distance'
+    """
+    from haversine import haversine_vector
+
+    # haversine_vector não aceita arrays vazios ( filtros sem nenhum pedido )
+    if df1.empty:
+        return df1.assign( distance=np.nan )
+
+    restaurante = df1.loc[:, ['Restaurant_latitude', 'Restaurant_longitude']].to_numpy()
+    entrega = df1.loc[:, ['Delivery_location_latitude', 'Delivery_location_longitude']].to_numpy()
+
+    return df1.assign( distance=haversine_vector( restaurante, entrega ) )
+
+def distance( df1 ):
+    avg_distance = round( df1['distance'].mean(), 2 )
+
+    return avg_distance
+
+def avg_time_delivery( df1, op, festival ):
+
+    """
+        Esta função calcula o tempo médio e o desvio padrão do tempo de entrega.
+        Parâmetros:
+            Input:
+                - df: Dataframe com os dados necessários para o cálculo
+                - op: Tipo de operação que precisa ser calculado
+                    'avg_time': Calcula o tempo médio
+                    'std_time': Calcula o desvio padrão do tempo.
+            Output:
+                - df: Dataframe com 2 colunas e 1 linha.
+    """
+
+    cols = ['Time_taken(min)', 'Festival']
+    df_aux = df1.loc[:, cols].groupby( 'Festival' ).agg( {'Time_taken(min)': ['mean', 'std']} )
+    df_aux.columns = ['avg_time', 'std_time']
+    df_aux = df_aux.reset_index()
+
+    linhas_selecionadas = df_aux['Festival'] == festival
+    df_aux = df_aux.loc[linhas_selecionadas, op].round(2)
+
+    return df_aux
+
+def first( series ):
+    """
+        Esta função devolve o primeiro valor de uma Series ( None se vazia ).
+    """
+    return series.iloc[0] if len( series ) > 0 else None
+
+def restaurant_overall( df1 ):
+    return {
+        'distancia_media': distance( df1 ),
+        'tempo_medio_festival': first( avg_time_delivery( df1, 'avg_time', 'Yes' ) ),
+        'std_tempo_festival': first( avg_time_delivery( df1, 'std_time', 'Yes' ) ),
+        'tempo_medio_sem_festival': first( avg_time_delivery( df1, 'avg_time', 'No' ) ),
+        'std_tempo_sem_festival': first( avg_time_delivery( df1, 'std_time', 'No' ) )
+    }
+
+def time_by_city( df1 ):
+    df_aux = df1.groupby( 'City' ).agg( {'Time_taken(min)': ['mean', 'std']} )
+
+    df_aux.columns = ['avg_time', 'std_time']
+
+    df_aux = df_aux.reset_index()
+
+    return df_aux
+
+def distance_by_city( df1 ):
+    avg_distance = df1.groupby( 'City' )['distance'].mean().reset_index().round(2)
+
+    return avg_distance
+
+def time_by_city_traffic( df1 ):
+    cols = ['City', 'Time_taken(min)', 'Road_traffic_density']
+    df_aux = ( df1.loc[:, cols]
+                  .groupby( ['City', 'Road_traffic_density'] )
+                  .agg( {'Time_taken(min)': ['mean', 'std']} )
+             )
+
+    df_aux.columns = ['avg_time', 'std_time']
+
+    df_aux = df_aux.reset_index()
+
+    return df_aux
+
+def avg_distance_restaurant( df1 ):
+    cols = ['Restaurant_latitude', 'Restaurant_longitude']
+    mean_count_distance_ratings = (
+        df1.groupby( cols )[['distance', 'Delivery_person_Ratings']]
+           .agg({'distance': ['mean', 'count'], 'Delivery_person_Ratings': 'mean'})
+           .reset_index()
+    )
+
+    mean_count_distance_ratings.columns = cols + [
+        'distance_mean', 'distance_count', 'ratings_mean'
+    ]
+
+    # O hash é calculado uma vez por restaurante, e não uma vez por pedido.
+    mean_count_distance_ratings['Restaurant_ID'] = (
+        mean_count_distance_ratings.apply( generate_point_id, axis=1 ).abs()
+    )
+    mean_count_distance_ratings = (
+        mean_count_distance_ratings.sort_values( by='distance_mean' )
+                                   .reset_index( drop=True )
+    )
+
+    return mean_count_distance_ratings[[
+        'Restaurant_ID', 'distance_mean', 'distance_count', 'ratings_mean'
+    ]]
@@ -0,0 +1,33 @@
+"""
+    Conversão dos resultados das métricas para JSON.
+
+    Usada pela API ( dashboard.api ) e pelo export estático ( dashboard.export ),
+    para que os dois publiquem os mesmos dados no mesmo formato.
+"""
+import json
+import pandas as pd
+
+# ----------------------------------------
+#                FUNÇÕES
+# ----------------------------------------
+
+def to_json_ready( obj ):
+    """
+        Esta função converte o resultado de uma métrica em objetos serializáveis.
+
+        Datas viram ISO 8601 e NaN vira null.
+
+            Input: DataFrame, Series, dict ou escalar
+            Output: Lista de dicts, dict ou escalar
+    """
+    # O índice das agregações ( data, semana, trânsito... ) vira coluna.
+    if isinstance( obj, ( pd.Series, pd.DataFrame ) ) and not isinstance( obj.index, pd.RangeIndex ):
+        obj = obj.reset_index()
+
+    if isinstance( obj, pd.DataFrame ):
+        return json.loads( obj.to_json( orient='records', date_format='iso' ) )
+
+    if isinstance( obj, dict ):
+        return json.loads( pd.Series( obj, dtype=object ).to_json( date_format='iso' ) )
+
+    return json.loads( pd.Series( [obj] ).to_json( orient='values' ) )[0]
@@ -0,0 +1,155 @@
+"""
+    Séries diárias de pedidos com consultas por data limite e janelas móveis.
+
+    Os agregados são guardados por dia: quantidade de pedidos ( com soma
+    acumulada ) e o conjunto de entregadores do dia como um bitset ( um bit por
+    entregador ). Bitsets se combinam com OR, então o número de entregadores
+    distintos de qualquer intervalo de dias sai de uma sparse table: dois
+    blocos pré-calculados de tamanho 2^k cobrem o intervalo. As consultas
+    custam O( dias ) e não O( pedidos ), e mover o slider de data não refaz a
+    agregação.
+"""
+import numpy as np
+import pandas as pd
+
+# Quantidade de bits 1 em cada byte
+POPCOUNT = np.unpackbits( np.arange( 256, dtype=np.uint8 )[:, None], axis=1 ).sum( axis=1 )
+
+
+class OrderSeries:
+    """
+        Esta classe guarda os agregados diários de pedidos e entregadores.
+
+        Uso:
+            series = OrderSeries( df1 )                 # df1 sem o filtro de data
+            series.orders_by_week( date_slider )       # == orders_by_week( df1 < date_slider )
+            series.orders_per_courier_by_week( date_slider )
+            series.rolling( 7 )                        # médias móveis de 7 dias
+    """
+
+    def __init__( self, df1 ):
+        datas = df1['Order_Date'].dt.normalize()
+        codes, self.couriers = pd.factorize( df1['Delivery_person_ID'] )
+
+        if len( df1 ) == 0:
+            self.days = pd.DatetimeIndex( [] )
+        else:
+            self.days = pd.date_range( datas.min(), datas.max(), freq='D' )
+
+        n_days = len( self.days )
+        dia = ( datas - self.days[0] ).dt.days.to_numpy() if n_days else np.array( [], dtype=int )
+
+        self.orders = np.bincount( dia, minlength=n_days )
+        self.cum_orders = np.concatenate( ( [0], np.cumsum( self.orders ) ) )
+        self.week_of_year = self.days.strftime( '%U' ).astype( 'int64' ).to_numpy()
+
+        # Bitset diário: linha = dia, bit = entregador
+        presenca = np.zeros( ( n_days, len( self.couriers ) ), dtype=bool )
+        presenca[dia, codes] = True
+        bits = np.packbits( presenca, axis=1 )
+
+        # table[k][i] = OR dos bitsets dos dias [i, i + 2^k)
+        self.table = [bits]
+        while 2 ** len( self.table ) <= n_days:
+            anterior = self.table[-1]
+            metade = 2 ** ( len( self.table ) - 1 )
+            self.table.append( anterior[:-metade] | anterior[metade:] )
+
+    # ------------------ blocos de consulta ------------------
+
+    def stop( self, cutoff=None ):
+        """
+            Esta função devolve quantos dias são anteriores à data limite.
+        """
+        if cutoff is None:
+            return len( self.days )
+
+        return int( self.days.searchsorted( pd.Timestamp( cutoff ) ) )
+
+    def range_bits( self, inicio, fim ):
+        """
+            Esta função devolve o bitset dos entregadores dos dias [inicio, fim).
+
+            inicio e fim podem ser arrays do mesmo tamanho, desde que todos os
+            intervalos tenham o mesmo comprimento.
+        """
+        tamanho = np.max( fim - inicio )
+        k = int( tamanho ).bit_length() - 1
+
+        return self.table[k][inicio] | self.table[k][fim - 2 ** k]
+
+    # ------------------ métricas ------------------
+
+    def orders_per_courier_by_week( self, cutoff=None ):
+        """
+            Esta função calcula pedidos, entregadores únicos e pedidos por
+            entregador de cada semana, com os pedidos anteriores à data limite.
+
+            Input: Data limite ( exclusiva, None usa todos os dias )
+            Output: Dataframe igual ao de metrics.orders_per_courier_by_week
+        """
+        stop = self.stop( cutoff )
+        semanas = self.week_of_year[:stop]
+
+        # Trechos de dias consecutivos da mesma semana ( [:stop] zera a lista quando não há dias )
+        inicio = np.flatnonzero( np.r_[True, semanas[1:] != semanas[:-1]] )[:stop]
+        fim = np.r_[inicio[1:], stop].astype( int )
+
+        pedidos, bits = {}, {}
+        for semana, i, f in zip( semanas[inicio], inicio, fim ):
+            pedidos[semana] = pedidos.get( semana, 0 ) + self.cum_orders[f] - self.cum_orders[i]
+            bits[semana] = bits.get( semana, 0 ) | self.range_bits( i, f )
+
+        df_aux = pd.DataFrame( {
+            'ID': pd.Series( pedidos, dtype='int64' ),
+            'Delivery_person_ID': pd.Series(
+                {semana: int( POPCOUNT[b].sum() ) for semana, b in bits.items()}, dtype='int64' )
+        } )
+        df_aux = df_aux.loc[df_aux['ID'] > 0].sort_index()
+        df_aux.index.name = 'week_of_year'
+
+        df_aux['order_by_deliver'] = (df_aux['ID'] / df_aux['Delivery_person_ID']).round(2)
+
+        return df_aux
+
+    def orders_by_week( self, cutoff=None ):
+        """
+            Esta função conta os pedidos de cada semana anteriores à data limite.
+
+            Input: Data limite ( exclusiva, None usa todos os dias )
+            Output: Series igual à de metrics.orders_by_week
+        """
+        return self.orders_per_courier_by_week( cutoff )['ID']
+
+    def rolling( self, window, cutoff=None ):
+        """
+            Esta função calcula as médias móveis diárias de uma janela de dias.
+
+            Input:
+                - window: Tamanho da janela em dias ( ex.: 7 ou 28 )
+                - cutoff: Data limite ( exclusiva, None usa todos os dias )
+            Output: Dataframe por dia com
+                - orders_ma: Média de pedidos por dia na janela
+                - couriers: Entregadores distintos na janela
+                - orders_per_courier: Pedidos da janela por entregador distinto
+                Dias sem a janela completa ficam com NaN.
+        """
+        stop = self.stop( cutoff )
+        df_aux = pd.DataFrame( index=self.days[:stop], columns=['orders_ma', 'couriers', 'orders_per_courier'],
+                               dtype='float64' )
+        df_aux.index.name = 'Order_Date'
+
+        if window > stop:
+            return df_aux
+
+        fim = np.arange( window, stop + 1 )
+        inicio = fim - window
+
+        soma = self.cum_orders[fim] - self.cum_orders[inicio]
+        distintos = POPCOUNT[self.range_bits( inicio, fim )].sum( axis=1 )
+
+        df_aux.iloc[window - 1:, 0] = soma / window
+        df_aux.iloc[window - 1:, 1] = distintos
+        df_aux.iloc[window - 1:, 2] = np.round( soma / np.maximum( distintos, 1 ), 2 )
+
+        return df_aux
@@ -0,0 +1,196 @@
+"""
+    Validação e quarentena dos dados brutos antes da limpeza.
+
+    Cada regra é avaliada de forma vetorizada sobre a coluna inteira e gera uma
+    máscara booleana. As linhas que falham em qualquer regra saem do dataset e
+    vão para um arquivo de quarentena com os códigos dos motivos ( ex.:
+    'missing:City;invalid_date:Order_Date' ), e a contagem de falhas por regra
+    é registrada no logger 'dashboard.validation'.
+
+    Uso:
+        python -m dashboard.validation dataset/train-delivery.csv
+"""
+import logging
+import sys
+import numpy as np
+import pandas as pd
+
+from pathlib import Path
+
+logger = logging.getLogger( __name__ )
+
+QUARANTINE_DIR = 'dataset/quarantine'
+
+# Colunas categóricas e os valores conhecidos ( após a limpeza do texto )
+KNOWN_CATEGORIES = {
+    'City': ['Metropolitian', 'Urban', 'Semi-Urban'],
+    'Festival': ['Yes', 'No'],
+    'Road_traffic_density': ['Low', 'Medium', 'High', 'Jam'],
+    'Weatherconditions': ['Sunny', 'Stormy', 'Sandstorms', 'Cloudy', 'Fog', 'Windy'],
+    'Type_of_order': ['Snack', 'Meal', 'Drinks', 'Buffet'],
+    'Type_of_vehicle': ['motorcycle', 'scooter', 'electric_scooter', 'bicycle']
+}
+
+# Colunas de identificação que não podem faltar
+REQUIRED = ['ID', 'Delivery_person_ID']
+MISSING_MARKERS = ['NaN', 'NaN ', '']
+
+# Colunas numéricas em que 'NaN ' é aceito ( vira NaN na limpeza )
+OPTIONAL_NUMERIC = ['Delivery_person_Age', 'Delivery_person_Ratings', 'multiple_deliveries']
+
+# Colunas de coordenadas e o limite absoluto de cada uma
+COORDINATES = {
+    'Restaurant_latitude': 90,
+    'Restaurant_longitude': 180,
+    'Delivery_location_latitude': 90,
+    'Delivery_location_longitude': 180
+}
+
+# ----------------------------------------
+#                FUNÇÕES
+# ----------------------------------------
+
+def as_text( serie ):
+    """
+        Esta função devolve a coluna como texto sem espaços nas pontas.
+        O marcador 'NaN' do dataset vira <NA>.
+    """
+    texto = serie.astype( 'string' ).str.strip()
+
+    return texto.mask( texto == 'NaN' )
+
+def last_token( serie ):
+    """
+        Esta função devolve a última palavra do texto ( 'conditions Sunny' -> 'Sunny' ).
+    """
+    return as_text( serie ).str.extract( r'(\S+)$', expand=False ).mask( lambda x: x == 'NaN' )
+
+def per_unique( serie, func ):
+    """
+        Esta função aplica func apenas nos valores distintos da coluna.
+
+        As colunas do dataset têm poucos valores distintos ( datas, cidades,
+        '(min) 24'... ), então o parse é feito uma vez por valor e o resultado
+        é espalhado para as linhas com os códigos do factorize. Valores
+        ausentes continuam ausentes.
+
+            Input: Coluna e função vetorizada ( Series -> Series )
+            Output: Series com o resultado de func para cada linha
+    """
+    codes, uniques = pd.factorize( serie )
+    resultado = func( pd.Series( uniques, dtype=object ) ).astype( object ).to_numpy()
+    resultado = np.append( resultado, None )
+
+    # O código -1 ( valor ausente ) aponta para o None do final.
+    return pd.Series( resultado[codes], index=serie.index )
+
+def rule_masks( df ):
+    """
+        Esta função avalia todas as regras do schema.
+
+            Input: Dataframe bruto ( como lido do csv )
+            Output: Dataframe booleano, uma coluna por regra ( True = linha falhou )
+    """
+    falhas = {}
+
+    for col in REQUIRED:
+        falhas[f'missing:{col}'] = df[col].isna() | df[col].isin( MISSING_MARKERS )
+
+    for col, valores in KNOWN_CATEGORIES.items():
+        texto = per_unique( df[col], last_token if col == 'Weatherconditions' else as_text )
+        falhas[f'missing:{col}'] = texto.isna()
+        falhas[f'unknown:{col}'] = texto.notna() & ~texto.isin( valores )
+
+    datas = per_unique( df['Order_Date'],
+                        lambda x: pd.to_datetime( x, format='%d-%m-%Y', errors='coerce' ) )
+    falhas['invalid_date:Order_Date'] = datas.isna()
+
+    for col in OPTIONAL_NUMERIC:
+        texto = per_unique( df[col], as_text )
+        numero = pd.to_numeric( texto, errors='coerce' )
+        falhas[f'invalid_number:{col}'] = texto.notna() & numero.isna()
+        falhas[f'negative:{col}'] = numero < 0
+
+        # Avaliações têm uma casa decimal: as médias somam décimos ( metrics.rating_mean ).
+        if col == 'Delivery_person_Ratings':
+            decimos = numero * 10
+            falhas[f'precision:{col}'] = ( decimos - decimos.round() ).abs() > 1e-6
+
+    # Tempo e condição do veículo são obrigatórios: ausente também é inválido.
+    tempo = pd.to_numeric( per_unique( df['Time_taken(min)'], last_token ), errors='coerce' )
+    condicao = pd.to_numeric( df['Vehicle_condition'], errors='coerce' )
+    # Os dois também são inteiros ( '(min) 24.5' não vira int64 na limpeza ).
+    for col, numero in ( ( 'Time_taken(min)', tempo ), ( 'Vehicle_condition', condicao ) ):
+        falhas[f'invalid_number:{col}'] = numero.isna() | ( numero % 1 != 0 )
+        falhas[f'negative:{col}'] = numero < 0
+
+    for col, limite in COORDINATES.items():
+        coordenada = pd.to_numeric( df[col], errors='coerce' )
+        falhas[f'out_of_range:{col}'] = ~coordenada.between( -limite, limite )
+
+    return pd.DataFrame( falhas, index=df.index ).fillna( False ).astype( bool )
+
+def validate( df ):
+    """
+        Esta função separa as linhas válidas das linhas em quarentena.
+
+            Input: Dataframe bruto
+            Output:
+                - valid: Linhas que passaram em todas as regras
+                - quarantine: Linhas que falharam, com a coluna 'reason_codes'
+                - counters: dict { regra: quantidade de linhas que falharam }
+    """
+    falhas = rule_masks( df )
+    invalidas = falhas.any( axis=1 )
+
+    counters = falhas.sum().astype( int )
+    counters = counters[counters > 0].to_dict()
+
+    # True * 'regra;' == 'regra;' e False * 'regra;' == '', então o produto
+    # matricial concatena os códigos das regras que falharam em cada linha.
+    codigos = pd.Series( falhas.columns + ';', index=falhas.columns )
+    reason_codes = falhas.loc[invalidas].dot( codigos ).str.rstrip( ';' )
+
+    quarantine = df.loc[invalidas].assign( reason_codes=reason_codes )
+
+    return df.loc[~invalidas].copy(), quarantine, counters
+
+def write_quarantine( quarantine, quarantine_dir=QUARANTINE_DIR ):
+    """
+        Esta função grava as linhas em quarentena em csv.
+
+        O nome do arquivo é derivado do conteúdo, então o mesmo lote ( ex.: a
+        página rodando de novo ) não gera arquivos repetidos.
+
+            Input: Dataframe de quarentena e pasta de destino
+            Output: Caminho do arquivo ( None se não houver linhas )
+    """
+    if quarantine.empty:
+        return None
+
+    assinatura = pd.util.hash_pandas_object( quarantine, index=True ).sum()
+    path = Path( quarantine_dir ) / f'quarantine-{assinatura:016x}.csv'
+
+    if not path.exists():
+        path.parent.mkdir( parents=True, exist_ok=True )
+        quarantine.to_csv( path, index=False )
+        logger.warning( '%d linhas em quarentena: %s', len( quarantine ), path )
+
+    return path
+
+def main( argv=None ):
+    argv = sys.argv[1:] if argv is None else argv
+    logging.basicConfig( level=logging.INFO, format='%(message)s' )
+
+    df = pd.read_csv( argv[0] if argv else 'dataset/train-delivery.csv' )
+    valid, quarantine, counters = validate( df )
+
+    print( f'{len( valid )} linhas válidas, {len( quarantine )} em quarentena' )
+    for regra, quantidade in sorted( counters.items(), key=lambda x: -x[1] ):
+        print( f'    {quantidade:>7}  {regra}' )
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit( main() )